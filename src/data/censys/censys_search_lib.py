@@ -1,16 +1,26 @@
 """
 library of classes and functions necessary to search in json files from censys.  using censys json files.
 """
-import gzip
 import logging
 import os
+import re
 import sys
 from multiprocessing import Queue
 from pathlib import Path
-from typing import Union, Mapping, Tuple, Dict
+from typing import Union, Mapping, Tuple, Iterable, Iterator, List
 
+import orjson
 import pandas as pd
-import rapidjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+import rapidgzip
+import simdjson
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 from src.experiment_lib import experiment_base
 
@@ -18,6 +28,98 @@ log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 logging.basicConfig(level=logging.INFO, format=log_fmt)
 logger = logging.getLogger(__name__)
 
+INPUT_READ_SIZE = 4 << 20
+DEFAULT_CHUNK_SIZE = 50000
+TLS_KEY = b'"tls"'
+CERTIFICATES_KEY = b'"certificates"'
+JSON_LINE_OPTIONS = orjson.OPT_APPEND_NEWLINE
+CERTIFICATE_FIELDS = ('ip', 'asn', 'issuer_dn', 'names', 'subject_dn', 'port', 'service_name', 'snapshot_date')
+INTEGER_FIELD_DTYPES = {'asn': 'Int64', 'port': 'Int64'}
+ARROW_BLOCK_SIZE = 8 << 20
+# only the fields needed for the certificate search, the arrow json reader skips the rest of a record
+CENSYS_CERTIFICATE_SCHEMA = pa.schema([
+    ('host_identifier', pa.struct([('ipv4', pa.string())])),
+    ('autonomous_system', pa.struct([('asn', pa.int64())])),
+    ('services', pa.list_(pa.struct([
+        ('port', pa.int64()),
+        ('service_name', pa.string()),
+        ('snapshot_date', pa.string()),
+        ('tls', pa.struct([
+            ('certificates', pa.struct([
+                ('leaf_data', pa.struct([
+                    ('issuer_dn', pa.string()),
+                    ('subject_dn', pa.string()),
+                    ('names', pa.list_(pa.string())),
+                ])),
+            ])),
+        ])),
+    ]))),
+])
+
+
+class DomainMatcher:
+    """
+    Finds a list of target domains in certificate names with a single pass over the names.
+    Uses an Aho-Corasick automaton if pyahocorasick is installed, otherwise falls back to one regular expression
+    alternating over all the escaped domains.
+    """
+
+    def __init__(self, domains: Iterable[str]):
+        """
+        @param domains: the target domains, their position is reported as the target index of a match.
+        """
+        self.domain_targets = dict()
+        for target_idx, domain in enumerate(domains):
+            if not pd.isna(domain):
+                self.domain_targets.setdefault(domain, list()).append(target_idx)
+        self.automaton = None
+        self.pattern = None
+        self.prefix_targets = None
+        if not self.domain_targets:
+            return
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for domain, target_indexes in self.domain_targets.items():
+                self.automaton.add_word(domain, target_indexes)
+            self.automaton.make_automaton()
+        else:
+            # the lookahead tries every start position, so overlapping matches are found as well.
+            # at each position the longest domain wins, the shorter domains matching there are its prefixes.
+            domains_by_length = sorted(self.domain_targets, key=len, reverse=True)
+            self.pattern = re.compile("(?=(" + "|".join(re.escape(domain) for domain in domains_by_length) + "))")
+            self.prefix_targets = {domain: [target_idx for prefix, target_indexes in self.domain_targets.items()
+                                            if domain.startswith(prefix) for target_idx in target_indexes]
+                                   for domain in self.domain_targets}
+
+    @property
+    def empty(self) -> bool:
+        """
+        True if there is no domain to search for.
+        """
+        return not self.domain_targets
+
+    def iter_matches(self, names_column: Iterable[Union[str, List[str]]]) -> Iterator[Tuple[int, int]]:
+        """
+        A generator yielding a (row index, target index) tuple for every target domain found in a row of names.
+        A tuple may be yielded more than once if the domain occurs several times in the same row.
+        @param names_column: the names of each certificate, either a list of names or a single string
+        """
+        if self.empty:
+            return
+        for cert_idx, names in enumerate(names_column):
+            if not names:
+                continue
+            if not isinstance(names, str):
+                # names can not contain a newline, so a domain never matches across two names
+                names = "\n".join(names)
+            if self.automaton is not None:
+                matched_target_lists = (target_indexes for _, target_indexes in self.automaton.iter(names))
+            else:
+                matched_target_lists = (self.prefix_targets[domain] for domain in self.pattern.findall(names))
+            for target_indexes in matched_target_lists:
+                for target_idx in target_indexes:
+                    yield cert_idx, target_idx
+
 
 class CensysResultWriter(experiment_base.WriterProcess):
     """
@@ -37,17 +139,18 @@ class CensysResultWriter(experiment_base.WriterProcess):
             self.output_file_path.parent.mkdir(parents=True)
         super().open_output_file()
 
-    def write_output_file(self, line: pd.DataFrame):
+    def write_output_file(self, line: bytes):
         """
-        writes the data frame into the output buffer/ or file.
-        Flushes the buffer after every 100 file.
+        writes the result table, received as an Arrow IPC stream, into the output buffer/ or file as json lines,
+        encoded by orjson.
+        The buffered writer of the output file drains itself into the compressor, no explicit flush is needed.
 
         """
         if line is not None:
-            line.to_json(self.output_file, orient='records', lines=True)
+            records = pa.ipc.open_stream(line).read_all().to_pylist()
+            buf = b"".join(orjson.dumps(record, option=JSON_LINE_OPTIONS) for record in records)
+            self.output_file.write(buf)
             self.results_uptil_now += 1
-            if (self.results_uptil_now % 100) == 0:
-                self.output_file.flush()
             logger.info(f'{self.results_uptil_now=}')
 
 
@@ -56,12 +159,25 @@ class CensysSearchExperimentJob(experiment_base.ExperimentJob):
 
     """
 
-    def __init__(self, input_file_path: Path, target_search_path, *args, **kwargs):
+    def __init__(self, input_file_path: Path, target_search_path, *args, decompression_threads: int = 1,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, json_reader: str = 'simdjson', **kwargs):
+        """
+        @param input_file_path: path to a censys json.gz file
+        @param target_search_path: path to the csv file listing the search targets
+        @param decompression_threads: number of threads used to decompress the input file
+        @param chunk_size: number of censys records searched and written together
+        @param json_reader: 'simdjson' to parse the records line by line, 'arrow' to read them with pyarrow
+        """
         super().__init__(*args, **kwargs)
         self.input_file_path: Path = input_file_path
         self.target_search_path: Path = target_search_path
+        self.decompression_threads: int = decompression_threads
+        self.chunk_size: int = chunk_size
+        self.json_reader: str = json_reader
         self._input_file = None
+        self._json_parser = None
         self.result = None
+        self.target_list: Union[pd.DataFrame, None] = None
         self.output_queue: Union[Queue, None] = None
         self.logger = None
 
@@ -70,31 +186,66 @@ class CensysSearchExperimentJob(experiment_base.ExperimentJob):
         Called inside the process. Performs some remaining initialization steps of an experiment jobs.
         Experiment jobs are passed through queues to processes, Python has issues pickling complex objects.
         Thus, we defer some initialization steps to be performed by the process executing the job.
+        A target_list data frame shared by all the jobs of the process can be passed as a keyword argument, so that
+        the target csv file is not read again for every input file.
         """
         self.logger = logger
         self.output_queue = output_queue
+        self.target_list = kwargs.get('target_list', None)
 
     @property
     def input_file(self):
         """
-        Opens the input file.
+        Opens the input file. The gzip file is decompressed in parallel by rapidgzip.
         """
         if self._input_file is None:
             if self.input_file_path.exists():
-                self._input_file = gzip.open(self.input_file_path, 'rb')
+                self._input_file = rapidgzip.open(str(self.input_file_path),
+                                                  parallelization=self.decompression_threads)
             else:
                 logger.warning(f"The input file {self.input_file_path} does not exist")
         return self._input_file
 
-    def extract_host_info(self, data: Dict) -> Tuple[str, Union[str, None]]:
+    def iter_input_lines(self):
+        """
+        A generator yielding the lines of the input file.
+        Reads the decompressed file in large blocks and splits them, instead of iterating the gzip file line by line.
+        The incomplete last line of each block is carried over to the next read.
+        """
+        remainder = b''
+        while True:
+            buf = self.input_file.read(INPUT_READ_SIZE)
+            if not buf:
+                break
+            lines = (remainder + buf).splitlines()
+            remainder = lines.pop() if buf[-1:] not in (b'\n', b'\r') else b''
+            yield from lines
+        if remainder:
+            yield remainder
+
+    @property
+    def json_parser(self) -> simdjson.Parser:
+        """
+        A simdjson parser reused for every record of the input file.
+        Created lazily, since parser objects can not be pickled along with the job.
+        """
+        if self._json_parser is None:
+            self._json_parser = simdjson.Parser()
+        return self._json_parser
+
+    def extract_host_info(self, data: simdjson.Object) -> Tuple[str, Union[str, None]]:
         """
         Extracts the host information part from a censys record.
-        @param data: a censys record dictionary
+        The nested fields are looked up with json pointers, without creating proxies for the enclosing objects.
+        @param data: a censys record, parsed by simdjson
         @return: IPv4 address and the ASN info
         """
-        ip = data['host_identifier']['ipv4']
-        as_info = data.get('autonomous_system', None)
-        asn = as_info.get('asn', None) if as_info else None
+        ip = data.at_pointer('/host_identifier/ipv4')
+        try:
+            asn = data.at_pointer('/autonomous_system/asn')
+        except (KeyError, IndexError, TypeError, ValueError):
+            # the record has no autonomous system info, or it is null
+            asn = None
         return ip, asn
 
     def __repr__(self):
@@ -106,76 +257,161 @@ class CensysCertificateSearchExperimentJobMixin(CensysSearchExperimentJob):
     Experiment Job encapsulating the functions and necessary data to extract information from censys certificates.
     """
 
-    def extract_certificates_from_censys_file(self, data: Dict,
-                                              expected_fields: Union[Mapping, None] = None) -> \
-            Union[Mapping, None]:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cols = None
+        self._col_appenders = None
+        self.reset_columns()
+
+    def reset_columns(self):
+        """
+        Allocates empty certificate columns. The append methods of the columns are bound once here, so that the
+        extractor does not look them up for every certificate.
+        """
+        self._cols = {field_name: [] for field_name in CERTIFICATE_FIELDS}
+        self._col_appenders = tuple(self._cols[field_name].append for field_name in CERTIFICATE_FIELDS)
+
+    def extract_certificates_from_censys_file(self, data: simdjson.Object,
+                                              expected_fields: Union[Mapping, None] = None):
         """
-        A generator function extracting certificate info from censys records.
+        Extracts the certificate info from a censys record and appends it to the certificate columns.
         @param data: A Censys record
         @param expected_fields: A dictionary of additional fields to be extracted from a censys records.
         """
+        (append_ip, append_asn, append_issuer_dn, append_names, append_subject_dn, append_port,
+         append_service_name, append_snapshot_date) = self._col_appenders
         ip, asn = self.extract_host_info(data)
-        for service in data['services']:
+        for service in data.at_pointer('/services'):
             try:
+                if 'tls' not in service:
+                    continue
                 port = service.get('port', None)
                 service_name = service.get('service_name', None)
                 snapshot_date = service.get('snapshot_date', None)
-                if 'tls' in service:
-                    service = service['tls']
-                    certificate = service['certificates']
-                    certificate = certificate.get('leaf_data', None)
-                    issuer_dn = certificate.get('issuer_dn', None)
-                    name_field = certificate.get('names', '')
-                    names = ";".join(name_field)
-                    splitted_name_field = name_field
-                    subject_dn = certificate.get('subject_dn', None)
-                    res = {"ip": ip, "asn": asn, "issuer_dn": issuer_dn,
-                           "names": names, "subject_dn": subject_dn, "port": port,
-                           "service_name": service_name, "splitted_names": splitted_name_field,
-                           "snapshot_date": snapshot_date}
-                    if expected_fields is not None:
-                        for field_name, field_address in expected_fields.items():
-                            res.setdefault(field_name, data[field_address])
-                    yield res
+                # a service without a leaf certificate raises here and is skipped
+                certificate = service.at_pointer('/tls/certificates/leaf_data')
+                issuer_dn = certificate.get('issuer_dn', None)
+                # null or non string entries are dropped here, so that a bad certificate can not fail the search
+                names = [name for name in certificate.get('names', ()) if isinstance(name, str)]
+                subject_dn = certificate.get('subject_dn', None)
+                extra_fields = None
+                if expected_fields is not None:
+                    extra_fields = dict()
+                    for field_name, field_address in expected_fields.items():
+                        value = data[field_address]
+                        if isinstance(value, simdjson.Object):
+                            value = value.as_dict()
+                        elif isinstance(value, simdjson.Array):
+                            value = value.as_list()
+                        extra_fields[field_name] = value
             except Exception as e:
-                logger.debug(f'{service=}')
-                logger.debug(f'{e}')
+                logger.debug('%s', service)
+                logger.debug('%s', e)
+                continue
+            # append only once every field is extracted, so that the columns stay aligned
+            append_ip(ip)
+            append_asn(asn)
+            append_issuer_dn(issuer_dn)
+            append_names(names)
+            append_subject_dn(subject_dn)
+            append_port(port)
+            append_service_name(service_name)
+            append_snapshot_date(snapshot_date)
+            if extra_fields is not None:
+                for field_name, value in extra_fields.items():
+                    self._cols.setdefault(field_name, list()).append(value)
+
+    def flatten_censys_file_to_dicts(self) -> Iterator[Mapping]:
+        """
+        Calls the extractor function, which stores the records column by column in a dictionary where each key is
+        a field name and its value is a list. Something like {'ip':['1.1.1.1','2.2.2.2'], 'asn':['1234','2345']...}
+        The columns are handed out and reallocated every chunk_size records with a certificate, so only one chunk of
+        the file is kept in memory.
+        @return: A generator of dictionaries of requested fields and their list of values.
+        """
+        num_records = 0
+        for line in self.iter_input_lines():
+            # records without a tls certificate are skipped with a substring search before parsing them
+            if TLS_KEY not in line or CERTIFICATES_KEY not in line:
                 continue
+            data = self.json_parser.parse(line)
+            self.extract_certificates_from_censys_file(data, None)
+            # the parser can only be reused once no proxy object references the previous document
+            del data
+            num_records += 1
+            if num_records >= self.chunk_size:
+                if self._cols['ip']:
+                    yield self._cols
+                self.reset_columns()
+                num_records = 0
+        self.input_file.close()
+        if self._cols['ip']:
+            yield self._cols
+        self.reset_columns()
 
-    def flatten_censys_file_to_dict(self) -> Mapping:
+    def read_censys_file_with_arrow(self) -> Iterator[Mapping]:
         """
-        Calls the extractor function and converts the records to a dictionary where each key is a field name and
-        its value is a list. Something like {'ip':['1.1.1.1','2.2.2.2'], 'asn':['1234','2345']...} sbw6557
-        @return: A dictionary of requested fields and their list of values.
+        Reads the input file with the pyarrow json reader instead of parsing it line by line.
+        Only the fields of CENSYS_CERTIFICATE_SCHEMA are parsed. Each block of the file becomes a record batch, whose
+        services are flattened to one row per service with a certificate.
+        @return: A generator of dictionaries of the certificate fields and their list of values, one per block.
         """
-        result_dict = dict()
-        for line in self.input_file:
-            data = rapidjson.loads(line)
-            for cert_info in self.extract_certificates_from_censys_file(data, None):
-                if cert_info:
-                    for key, value in cert_info.items():
-                        result_dict.setdefault(key, list()).append(value)
+        reader = pa_json.open_json(self.input_file,
+                                   # every worker process parses on its own thread, like the simdjson reader,
+                                   # so that the total number of threads stays close to the number of cores
+                                   read_options=pa_json.ReadOptions(use_threads=False, block_size=ARROW_BLOCK_SIZE),
+                                   parse_options=pa_json.ParseOptions(explicit_schema=CENSYS_CERTIFICATE_SCHEMA,
+                                                                      unexpected_field_behavior='ignore'))
+        for batch in reader:
+            services = batch.column('services')
+            flat_services = pc.list_flatten(services)
+            leaf_data = pc.struct_field(flat_services, ['tls', 'certificates', 'leaf_data'])
+            has_certificate = pc.is_valid(leaf_data)
+            host_rows = pc.filter(pc.list_parent_indices(services), has_certificate)
+            if len(host_rows) == 0:
+                continue
+            flat_services = pc.filter(flat_services, has_certificate)
+            leaf_data = pc.filter(leaf_data, has_certificate)
+            columns = {
+                'ip': pc.take(pc.struct_field(batch.column('host_identifier'), ['ipv4']), host_rows),
+                'asn': pc.take(pc.struct_field(batch.column('autonomous_system'), ['asn']), host_rows),
+                'issuer_dn': pc.struct_field(leaf_data, ['issuer_dn']),
+                'names': pc.struct_field(leaf_data, ['names']),
+                'subject_dn': pc.struct_field(leaf_data, ['subject_dn']),
+                'port': pc.struct_field(flat_services, ['port']),
+                'service_name': pc.struct_field(flat_services, ['service_name']),
+                'snapshot_date': pc.struct_field(flat_services, ['snapshot_date']),
+            }
+            # the search works on the rows of python lists, the same as the columns of the line by line reader
+            certificate_columns = {field_name: column.to_pylist() for field_name, column in columns.items()}
+            # same as the line by line reader, a missing names list is empty and null names are dropped
+            certificate_columns['names'] = [[name for name in names if name is not None] if names else []
+                                            for names in certificate_columns['names']]
+            yield certificate_columns
         self.input_file.close()
-        return result_dict
 
     def prepare_input_and_target_files(self):
         """
 
         @return:
         """
-        certificates_dict = self.flatten_censys_file_to_dict()
-        if not self.target_search_path.exists():
-            raise FileNotFoundError(f'{self.target_search_path=} does not exists')
-        target_list = pd.read_csv(self.target_search_path)
-        return certificates_dict, target_list
+        if self.target_list is None:
+            self.target_list = read_target_list(self.target_search_path)
+        target_list = self.target_list
+        if self.json_reader == 'arrow':
+            certificates_chunks = self.read_censys_file_with_arrow()
+        else:
+            certificates_chunks = self.flatten_censys_file_to_dicts()
+        return certificates_chunks, target_list
 
     def search_for_targets_in_censys_certificates(self):
         """
-
+        A generator yielding the search result of each chunk of the input file.
         @return:
         """
-        certificates_dict, target_list = self.prepare_input_and_target_files()
-        return self.search_for_target_func(certificates_dict, target_list)
+        certificates_chunks, target_list = self.prepare_input_and_target_files()
+        for certificates_dict in certificates_chunks:
+            yield self.search_for_target_func(certificates_dict, target_list)
 
         # match_list = []
         # for name, pattern in zip(final_result.name, final_result.search_pattern):
@@ -189,9 +425,9 @@ class CensysCertificateSearchExperimentJobMixin(CensysSearchExperimentJob):
         @return:
         """
         try:
-            result = self.search_for_targets_in_censys_certificates()
-            if result is not None:
-                self.output_queue.put(result)
+            for result in self.search_for_targets_in_censys_certificates():
+                if result is not None:
+                    self.output_queue.put(dataframe_to_ipc_bytes(result))
         except Exception as e:
             self.logger.error(f'Exception happened while processing the file: {e}, {self}')
         print(f'finished a file {self}, {self.input_file_path}')
@@ -202,8 +438,18 @@ class CensysCertificateDomainSearchExperimentJob(CensysCertificateSearchExperime
     Given a list of domain names, searches for the domain names in the certificates
     """
 
-    @staticmethod
-    def search_for_target_func(certificates_dict, target_list):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.domain_matcher: Union[DomainMatcher, None] = None
+
+    def deferred_init(self, logger: logging.Logger, output_queue: Queue, **kwargs):
+        """
+        Also accepts a domain_matcher built once for the target list, instead of building it for every job.
+        """
+        super().deferred_init(logger, output_queue, **kwargs)
+        self.domain_matcher = kwargs.get('domain_matcher', None)
+
+    def search_for_target_func(self, certificates_dict, target_list):
         """
 
         @param certificates_dict:
@@ -212,29 +458,25 @@ class CensysCertificateDomainSearchExperimentJob(CensysCertificateSearchExperime
         """
         final_result = None
         try:
-            result = pd.DataFrame.from_dict(certificates_dict)
-            result = result.loc[result.names.notna(),]
-            for row in target_list.to_dict('records'):
-                new_res = None
-                new_res = result[result.names.str.contains(row['generalized_domain'])].copy()
-                if new_res.empty:
-                    continue
-                #
-                new_res['company'] = None
-                new_res['search_method'] = None
-                new_res['generalized_domain'] = None
-                new_res[['company', 'search_method',
-                         'generalized_domain']] = [row['Company_name'],
-                                                   'domain_in_cn_san', row['generalized_domain']]
-
-                final_result = new_res if final_result is None else pd.concat([new_res, final_result],
-                                                                              ignore_index=True)
-            if final_result is None:
+            if self.domain_matcher is None:
+                self.domain_matcher = DomainMatcher(target_list['generalized_domain'])
+            matcher = self.domain_matcher
+            if matcher.empty:
+                return None
+            matches = set(matcher.iter_matches(certificates_dict['names']))
+            if not matches:
                 return None
-            final_result = final_result.loc[~final_result.company.isna(),]
-            final_result['splitted_names'] = final_result.names.str.split(";")
-            final_result = final_result.assign(name=final_result['splitted_names']).explode('names').drop(
-                ['splitted_names'], axis=1)
+            cert_indexes, target_indexes = zip(*sorted(matches))
+            targets = target_list.iloc[list(target_indexes)]
+            # only the matched rows are copied out of the certificate columns, the chunk is never turned into a frame
+            final_result = pd.DataFrame({field_name: [column[cert_idx] for cert_idx in cert_indexes]
+                                         for field_name, column in certificates_dict.items()})
+            # nullable integers, otherwise a missing value turns the column into floats in some chunks only
+            final_result = final_result.astype(INTEGER_FIELD_DTYPES)
+            final_result = final_result.assign(company=targets['Company_name'].values,
+                                               search_method='domain_in_cn_san',
+                                               generalized_domain=targets['generalized_domain'].values)
+            final_result = final_result[final_result.company.notna()].explode('names')
         except Exception as e:
             exc_type, exc_obj, exc_tb = sys.exc_info()
             fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
@@ -243,6 +485,70 @@ class CensysCertificateDomainSearchExperimentJob(CensysCertificateSearchExperime
             return final_result
 
 
+_domain_search_worker_state = dict()
+
+
+def init_domain_search_worker(output_queue: Queue, target_search_path: Path, job_kwargs: Mapping,
+                              decompression_threads: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              json_reader: str = 'simdjson'):
+    """
+    Initializer of the worker processes of a domain search pool. It runs once per worker and keeps the state shared
+    by all the files the worker processes, such as the target list and the domain matcher.
+    @param output_queue: queue consumed by the writer process
+    @param target_search_path: path to the csv file listing the target domains
+    @param job_kwargs: keyword arguments passed to the deferred_init of every job
+    @param decompression_threads: number of threads used to decompress an input file
+    @param chunk_size: number of censys records searched and written together
+    @param json_reader: 'simdjson' to parse the records line by line, 'arrow' to read them with pyarrow
+    """
+    _domain_search_worker_state.update(output_queue=output_queue, target_search_path=target_search_path,
+                                       job_kwargs=job_kwargs, decompression_threads=decompression_threads,
+                                       chunk_size=chunk_size, json_reader=json_reader)
+
+
+def search_domains_in_censys_file(input_file_path: Path) -> Path:
+    """
+    Searches the target domains in a censys file, inside a worker initialized by init_domain_search_worker.
+    The results are pushed to the output queue of the worker, chunk by chunk.
+    @param input_file_path: path to a censys json.gz file
+    @return: the path of the processed file
+    """
+    state = _domain_search_worker_state
+    job = CensysCertificateDomainSearchExperimentJob(input_file_path, state['target_search_path'],
+                                                     decompression_threads=state['decompression_threads'],
+                                                     chunk_size=state['chunk_size'],
+                                                     json_reader=state['json_reader'])
+    job.deferred_init(logger, state['output_queue'], **state['job_kwargs'])
+    logger.info(f'starting the job {job}')
+    job.run_job()
+    return input_file_path
+
+
+def read_target_list(target_search_path: Path) -> pd.DataFrame:
+    """
+    Reads the csv file listing the search targets.
+    @param target_search_path: path to the csv file
+    @return: the target list
+    """
+    if not target_search_path.exists():
+        raise FileNotFoundError(f'{target_search_path=} does not exists')
+    return pd.read_csv(target_search_path)
+
+
+def dataframe_to_ipc_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serializes a data frame into an Arrow IPC stream.
+    Sending the stream through a queue is much cheaper than pickling and unpickling the data frame itself.
+    @param df: the data frame to serialize
+    @return: the IPC stream as bytes
+    """
+    batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as stream_writer:
+        stream_writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
 def generate_censys_input_files(project_dir: Path):
     """
 
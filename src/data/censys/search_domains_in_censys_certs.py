@@ -1,11 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime as dt
-from os import getenv
+from os import getenv, cpu_count
 
 import click
 from dotenv import load_dotenv
 
 from src.data.censys.censys_search_lib import *
-from src.experiment_lib.experiment_base import ExperimentProcWithWriter
 
 log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s - %(lineno)d-  %(message)s'
 logging.basicConfig(level=logging.DEBUG, format=log_fmt)
@@ -32,34 +32,34 @@ def execute_domain_search_in_censys_certs(env_file):
         output_file_path.parent.mkdir(parents=True)
 
     num_processes = int(getenv('NUM_PROCESSES', 1))
+    # keep the total number of decompression threads close to the number of cores
+    decompression_threads = max(1, (cpu_count() or 1) // num_processes)
+    chunk_size = int(getenv('CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+    json_reader = getenv('JSON_READER', 'simdjson')
 
-    process_list = []
-    job_queue = Queue()
-    output_queue = Queue()
+    # the target list and its matcher are loaded once and shared by the jobs of every worker
+    target_list = read_target_list(domain_search_path)
+    job_kwargs = {'target_list': target_list,
+                  'domain_matcher': DomainMatcher(target_list['generalized_domain'])}
 
-    logger.info('Creating jobs')
-    for input_file_path in input_files:
-        job = CensysCertificateDomainSearchExperimentJob(input_file_path, domain_search_path)
-        logger.info(f'putting the job : {job}')
-        job_queue.put(job)
-
-    logger.info(f'num jobs: {job_queue.qsize()}')
-
-    logger.info('Initializing and starting the processes')
-
-    for proc in range(num_processes):
-        exp = ExperimentProcWithWriter(output_queue, job_queue, logger)
-        process_list.append(exp)
-        job_queue.put(None)
-        exp.start()
-
-    writer_process = CensysResultWriter(output_queue, num_processes, output_file_path, logger)
+    # bounded, so that the workers wait for the writer instead of piling up results in memory
+    output_queue = Queue(maxsize=num_processes * 2)
+    writer_process = CensysResultWriter(output_queue, 1, output_file_path, logger)
     writer_process.start()
 
-    logger.info('Waiting for processes to finish the jobs')
-    for proc in process_list:
-        proc.join()
-    writer_process.join()
+    logger.info(f'Searching {len(input_files)} files with {num_processes} processes')
+    try:
+        with ProcessPoolExecutor(max_workers=num_processes, initializer=init_domain_search_worker,
+                                 initargs=(output_queue, domain_search_path, job_kwargs, decompression_threads,
+                                           chunk_size, json_reader)) as executor:
+            # every file is a long job, so the files are handed out one at a time to balance the load
+            for input_file_path in executor.map(search_domains_in_censys_file, input_files):
+                logger.info(f'finished the file {input_file_path}')
+    finally:
+        # the writer only stops on the sentinel, it has to be sent even if the pool failed
+        logger.info('Waiting for the writer to finish')
+        output_queue.put(None)
+        writer_process.join()
     logger.info('All tasks are finished. ')
 
 
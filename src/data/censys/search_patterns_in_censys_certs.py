@@ -1,5 +1,5 @@
 from datetime import datetime as dt
-from os import getenv
+from os import getenv, cpu_count
 
 import click
 from dotenv import load_dotenv
@@ -32,6 +32,13 @@ def execute_pattern_search_in_censys_certs(env_file):
         output_file_path.parent.mkdir(parents=True)
 
     num_processes = int(getenv('NUM_PROCESSES', 1))
+    # keep the total number of decompression threads close to the number of cores
+    decompression_threads = max(1, (cpu_count() or 1) // num_processes)
+    chunk_size = int(getenv('CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+    json_reader = getenv('JSON_READER', 'simdjson')
+
+    # the pattern list is loaded once and shared by the jobs of every process
+    job_kwargs = {'target_list': read_target_list(domain_search_path)}
 
     process_list = []
     job_queue = Queue()
@@ -39,7 +46,9 @@ def execute_pattern_search_in_censys_certs(env_file):
 
     logger.info('Creating jobs')
     for input_file_path in input_files:
-        job = CensysCertificatePatternSearchExperimentJob(input_file_path, domain_search_path)
+        job = CensysCertificatePatternSearchExperimentJob(input_file_path, domain_search_path,
+                                                          decompression_threads=decompression_threads,
+                                                          chunk_size=chunk_size, json_reader=json_reader)
         logger.info(f'putting the job : {job}')
         job_queue.put(job)
 
@@ -48,7 +57,7 @@ def execute_pattern_search_in_censys_certs(env_file):
     logger.info('Initializing and starting the processes')
 
     for proc in range(num_processes):
-        exp = ExperimentProcWithWriter(output_queue, job_queue, logger)
+        exp = ExperimentProcWithWriter(output_queue, job_queue, logger, job_kwargs=job_kwargs)
         process_list.append(exp)
         job_queue.put(None)
         exp.start()
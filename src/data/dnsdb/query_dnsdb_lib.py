@@ -2,15 +2,18 @@
 Module with classes and functions to query different DNSDB APIs
 """
 import gzip
-import json
+import io
 import logging
 from collections.abc import Mapping
 from pathlib import Path
 from typing import List, Any, Union, Dict
 
 import dnsdb2
+import orjson
 import pandas as pd
 
+from src.experiment_lib.experiment_base import OUTPUT_COMPRESSION_LEVEL, OUTPUT_BUFFER_SIZE
+
 log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 logging.basicConfig(level=logging.DEBUG, format=log_fmt)
 logger = logging.getLogger(__name__)
@@ -52,6 +55,24 @@ class DNSDBQueryExecutorBasic:
                 query_list[field] = query_list[field].apply(lambda x: x.replace('rrset/name/', ''))
         return query_list
 
+    def group_companies_by_query(self) -> Dict[str, List[Any]]:
+        """
+        Many companies share the same queries. Each query, which also contains its rrtype, is sent only once,
+        and the results are attributed to all the companies that listed the query.
+        @return: A dictionary mapping each distinct query to the list of companies that listed it.
+        """
+        query_fields = [query_field for query_field in self.query_fields if query_field in self.query_list.columns]
+        for query_field in self.query_fields:
+            if query_field not in query_fields:
+                logger.warning(f'{query_field=} was not in the list of queries')
+        long_query_list = pd.melt(self.query_list, id_vars=['company'], value_vars=query_fields,
+                                  value_name='query').dropna(subset=['query'])
+        # stray whitespace would otherwise turn the same query into a separate api call
+        long_query_list['query'] = long_query_list['query'].astype(str).str.strip()
+        companies_by_query = long_query_list.groupby('query', sort=False)['company'].agg(
+            lambda companies: companies.drop_duplicates().tolist())
+        return companies_by_query.to_dict()
+
     def send_dnsdb_query_helper(self, query, *args, **kwargs):
         """
         This is a wrapper function to run different dnsdb queries. This allows the subclasses to override and run
@@ -107,38 +128,31 @@ class DNSDBQueryExecutorBasic:
     def process_dnsdb_query(self, query_str: str, fout, query_metadata: Union[Mapping[Any, Any], None] = None):
         """
         For each query string, perform the lookup,
-        convert the result to json and write it to the output stream.
+        convert the results to json lines and write them to the output stream in a single write.
         """
+        lines = list()
         for result in self.dnsdb_send_query(query_str):
             try:
                 js: Dict = result
                 if query_metadata is not None:
                     js.update(query_metadata)
-                for_out = json.dumps(result)
-                fout.write(f'{for_out}\n'.encode())
+                lines.append(orjson.dumps(js, option=orjson.OPT_APPEND_NEWLINE))
             except Exception as e:
                 logger.exception(f'An error happened {query_str=} {result=} {e=}')
+        fout.write(b"".join(lines))
 
     def run_dnsdb_queries(self) -> None:
         """
         Main function to execute the DNSDB queries and save the results.
+        The output is compressed at a low level behind a write buffer, the dnsdb client reuses its http session for
+        all the queries. The company field of a result lists every company that shares its query.
         """
-        with gzip.open(self.output_file_path, 'wb') as fout:
-            # counter = 0
-            for idx, row in self.query_list.iterrows():
-                logger.info(row)
-                # if counter > 1:
-                #     break
-                # counter += 1
-                for query_field in self.query_fields:
-                    if query_field in row:
-                        query = f'{row[query_field]}'
-                        company = row['company']
-                        query_meta_data = {'company': company}
-                        logger.info(f'{query=}, {query_meta_data=}')
-                        self.process_dnsdb_query(query, fout, query_meta_data)
-                    else:
-                        logger.warning(f'{query_field=} was not in the list of queries')
+        output_file = gzip.open(self.output_file_path, 'wb', compresslevel=OUTPUT_COMPRESSION_LEVEL)
+        with io.BufferedWriter(output_file, buffer_size=OUTPUT_BUFFER_SIZE) as fout:
+            for query, companies in self.group_companies_by_query().items():
+                query_meta_data = {'company': companies}
+                logger.info(f'{query=}, {query_meta_data=}')
+                self.process_dnsdb_query(f'{query}', fout, query_meta_data)
 
 
 class DNSDBQueryExecutorFlexibleRegexSearch(DNSDBQueryExecutorBasic):
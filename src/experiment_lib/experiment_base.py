@@ -1,9 +1,13 @@
 import gzip
+import io
 import queue
 from multiprocessing import Process
 from multiprocessing import Queue
 from pathlib import Path
 
+OUTPUT_COMPRESSION_LEVEL = 1
+OUTPUT_BUFFER_SIZE = 1 << 20
+
 
 class ExperimentJob:
     """
@@ -54,10 +58,15 @@ class ExperimentProcWithWriter(ExperimentProc):
     A python process that executes the Experiment jobs but also supports an output queue for writing the results.
     """
 
-    def __init__(self, output_queue: Queue, *args, **kwargs):
+    def __init__(self, output_queue: Queue, *args, job_kwargs: dict = None, **kwargs):
+        """
+        @param output_queue: queue consumed by the writer process
+        @param job_kwargs: keyword arguments passed to the deferred_init of every job, to share state loaded once
+        """
+        self.hitlist: set = kwargs.pop('hitlist', None)
         super().__init__(*args, **kwargs)
         self.output_queue = output_queue
-        self.hitlist: set = kwargs['hitlist'] if 'hitlist' in kwargs else None
+        self.job_kwargs: dict = job_kwargs if job_kwargs is not None else dict()
         self.num_jobs = 0
 
     def run(self):
@@ -74,7 +83,7 @@ class ExperimentProcWithWriter(ExperimentProc):
                 break
             if next_job is None:
                 break
-            next_job.deferred_init(self.logger, self.output_queue, hitlist=self.hitlist)
+            next_job.deferred_init(self.logger, self.output_queue, hitlist=self.hitlist, **self.job_kwargs)
             self.num_jobs += 1
             self.logger.info(f"{self.name} starting the job {next_job}")
             next_job.run_job()
@@ -146,5 +155,9 @@ class WriterProcess(Process):
     def open_output_file(self):
         """
         Opens a compressed gzip file by default.
+        A low compression level keeps the writer from becoming the bottleneck, the json output still compresses well.
+        Small writes are batched by a buffer in front of the compressor.
         """
-        self.output_file = gzip.open(self.output_file_path, 'wb')
+        self.output_file = io.BufferedWriter(gzip.open(self.output_file_path, 'wb',
+                                                       compresslevel=OUTPUT_COMPRESSION_LEVEL),
+                                             buffer_size=OUTPUT_BUFFER_SIZE)